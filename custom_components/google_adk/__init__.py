@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import os
 
@@ -9,22 +11,29 @@ from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 
 from .const import CONF_API_KEY
-from .types import GoogleAdkConfigEntry
+from .types import GoogleAdkConfigEntry, GoogleAdkData
 
 _LOGGER = logging.getLogger(__name__)
 
 
 PLATFORMS: tuple[Platform] = (Platform.CONVERSATION,)
 
+# Set once GOOGLE_API_KEY has been checked so reloads skip the environment probe
+_API_KEY_SET = False
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: GoogleAdkConfigEntry) -> bool:
     """Set up a config entry."""
-    if os.environ.get("GOOGLE_API_KEY") is None:
-        _LOGGER.info("Setting GOOGLE_API_KEY environment variable")
-        os.environ["GOOGLE_API_KEY"] = entry.data[CONF_API_KEY]
-    else:
-        _LOGGER.info("GOOGLE_API_KEY environment variable already set")
+    global _API_KEY_SET
+    if not _API_KEY_SET:
+        if os.environ.get("GOOGLE_API_KEY") is None:
+            _LOGGER.info("Setting GOOGLE_API_KEY environment variable")
+            os.environ["GOOGLE_API_KEY"] = entry.data[CONF_API_KEY]
+        else:
+            _LOGGER.debug("GOOGLE_API_KEY environment variable already set")
+        _API_KEY_SET = True
 
+    entry.runtime_data = GoogleAdkData(fingerprint=_entry_fingerprint(entry))
     await hass.config_entries.async_forward_entry_setups(
         entry,
         platforms=PLATFORMS,
@@ -43,4 +52,26 @@ async def async_unload_entry(hass: HomeAssistant, entry: GoogleAdkConfigEntry) -
 
 async def async_reload_entry(hass: HomeAssistant, entry: GoogleAdkConfigEntry) -> None:
     """Reload config entry."""
+    # Agents are built from the entry and subentry settings, so an update that
+    # leaves them unchanged does not need to tear down every agent.
+    fingerprint = _entry_fingerprint(entry)
+    if fingerprint == entry.runtime_data.fingerprint:
+        _LOGGER.debug("Skipping reload of unchanged entry %s", entry.entry_id)
+        return
+    entry.runtime_data.fingerprint = fingerprint
     await hass.config_entries.async_reload(entry.entry_id)
+
+
+def _entry_fingerprint(entry: GoogleAdkConfigEntry) -> str:
+    """Return a digest of the settings that agents are built from."""
+    settings = {
+        "data": dict(entry.data),
+        "options": dict(entry.options),
+        "subentries": {
+            subentry_id: [subentry.subentry_type, subentry.title, dict(subentry.data)]
+            for subentry_id, subentry in entry.subentries.items()
+        },
+    }
+    return hashlib.blake2b(
+        json.dumps(settings, sort_keys=True, default=str).encode(), digest_size=16
+    ).hexdigest()
@@ -1,12 +1,21 @@
 """Module for agents."""
 
+import asyncio
+import functools
+import hashlib
+import json
 import logging
+import re
+from collections import OrderedDict
 from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
 from typing import Any, cast
 
 from google.adk.agents import BaseAgent, LlmAgent
 from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.base_llm import BaseLlm
 from google.adk.models.google_llm import Gemini
+from google.adk.models.registry import LLMRegistry
 from google.adk.sessions import Session
 from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.preload_memory_tool import PreloadMemoryTool
@@ -48,29 +57,56 @@ def _to_json_schema(schema: Any) -> Any:
 _EMPTY_JSON_SCHEMA: dict[str, Any] = {"type": "object", "properties": {}}
 
 
+@dataclass
+class _AgentBuild:
+    """State shared while building an agent and its sub_agents."""
+
+    hass: HomeAssistant
+    llm_context: llm.LLMContext
+    subentry_index: dict[str, ConfigSubentry]
+    models: dict[tuple[str, bool], BaseLlm]
+    llm_apis: dict[tuple[str, ...], asyncio.Task[llm.APIInstance]] = field(
+        default_factory=dict
+    )
+    # Keyed by id(), the tools are kept alive by the cached API instances
+    tool_parameters: dict[int, Schema | None] = field(default_factory=dict)
+
+
 async def async_create(
-    hass: HomeAssistant, subentry: ConfigSubentry, llm_context: llm.LLMContext
+    hass: HomeAssistant,
+    subentry: ConfigSubentry,
+    llm_context: llm.LLMContext,
+    models: dict[tuple[str, bool], BaseLlm] | None = None,
 ) -> BaseAgent:
     """Register all agents using the agent framework."""
+    build = _AgentBuild(
+        hass,
+        llm_context,
+        _build_subentry_index(hass),
+        models if models is not None else {},
+    )
+    return await _async_create_agent(build, subentry, frozenset())
+
+
+async def _async_create_agent(
+    build: _AgentBuild, subentry: ConfigSubentry, ancestors: frozenset[str]
+) -> BaseAgent:
+    """Create an agent and its sub_agents for a given agent subentry."""
     _LOGGER.debug("Registering Google ADK agent '%s'", subentry.title)
     use_interactions_api = subentry.data.get(CONF_USE_INTERACTIONS_API, False)
     tools: list[Any] = await _async_create_tools(
-        hass, subentry, llm_context, use_interactions_api=use_interactions_api
+        build, subentry, use_interactions_api=use_interactions_api
     )
-    sub_agents = await _async_create_sub_agents(hass, subentry, llm_context)
+    sub_agents = await _async_create_sub_agents(build, subentry, ancestors)
 
     memory_enabled = subentry.data.get(CONF_MEMORY_ENABLED, False)
     if memory_enabled:
         tools.append(PreloadMemoryTool())
 
-    model_name = subentry.data[CONF_MODEL]
-    if use_interactions_api:
-        model = Gemini(model=model_name, use_interactions_api=True)
-    else:
-        model = model_name
+    model = _get_model(build, subentry.data[CONF_MODEL], use_interactions_api)
 
     agent = LlmAgent(
-        name=slugify(subentry.title, separator="_"),
+        name=_slug_for(subentry.subentry_id, subentry.title),
         model=model,
         description=subentry.data[CONF_DESCRIPTION],
         instruction=subentry.data[CONF_INSTRUCTIONS],
@@ -79,91 +115,233 @@ async def async_create(
     )
 
     if memory_enabled:
-        agent.after_agent_callback = _create_memory_callback(hass, subentry)
+        agent.after_agent_callback = _create_memory_callback(build.hass, subentry)
 
     return agent
 
 
-def _sub_agent_entry(entry_id: str, hass: HomeAssistant) -> ConfigSubentry | None:
-    """Get sub_agent config entry by ID."""
-    for entry in hass.config_entries.async_entries(DOMAIN):
-        for subentry in entry.subentries.values():
-            if subentry.subentry_id == entry_id:
-                return subentry
-    return None
+def _get_model(
+    build: _AgentBuild, model_name: str, use_interactions_api: bool
+) -> BaseLlm | str:
+    """Return a shared model instance for the model name."""
+    if not model_name:
+        # Let the agent inherit the model from its parent
+        return model_name
+    key = (model_name, use_interactions_api)
+    if (model := build.models.get(key)) is None:
+        if use_interactions_api:
+            model = Gemini(model=model_name, use_interactions_api=True)
+        else:
+            # Resolve the name the same way LlmAgent would for a model string
+            try:
+                model = LLMRegistry.new_llm(model_name)
+            except ValueError:
+                # Leave unknown names to the agent so the error surfaces when it runs
+                return model_name
+        build.models[key] = model
+    return model
+
+
+@functools.lru_cache(maxsize=256)
+def _slug_for(subentry_id: str, title: str) -> str:
+    """Return the agent name for a subentry, keyed on title to follow renames."""
+    return slugify(title, separator="_")
+
+
+def _build_subentry_index(hass: HomeAssistant) -> dict[str, ConfigSubentry]:
+    """Return all subentries of the integration keyed by subentry ID."""
+    return {
+        subentry.subentry_id: subentry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        for subentry in entry.subentries.values()
+    }
 
 
 async def _async_create_sub_agents(
-    hass: HomeAssistant, subentry: ConfigSubentry, llm_context: llm.LLMContext
+    build: _AgentBuild, subentry: ConfigSubentry, ancestors: frozenset[str]
 ) -> list[BaseAgent]:
     """Create sub_agents for a given agent subentry."""
-    sub_agents: list[BaseAgent] = []
+    ancestors = ancestors | {subentry.subentry_id}
+    sub_agent_entries: list[ConfigSubentry] = []
     for sub_agent_id in subentry.data.get("sub_agents", []):
-        if (sub_agent_entry := _sub_agent_entry(sub_agent_id, hass)) is None:
+        if (sub_agent_entry := build.subentry_index.get(sub_agent_id)) is None:
             _LOGGER.warning(
                 "Sub-agent with ID '%s' not found for agent '%s'",
                 sub_agent_id,
                 subentry.title,
             )
             continue
-        sub_agent = await async_create(hass, sub_agent_entry, llm_context)
-        sub_agents.append(sub_agent)
-    return sub_agents
-
-
-SUPPORTED_SCHEMA_KEYS = {
-    # Gemini API does not support all of the OpenAPI schema
-    # SoT: https://ai.google.dev/api/caching#Schema
-    "type",
-    "format",
-    "description",
-    "nullable",
-    "enum",
-    "max_items",
-    "min_items",
-    "properties",
-    "required",
-    "items",
-}
+        if sub_agent_id in ancestors:
+            _LOGGER.warning(
+                "Sub-agent '%s' for agent '%s' would create a cycle",
+                sub_agent_entry.title,
+                subentry.title,
+            )
+            continue
+        sub_agent_entries.append(sub_agent_entry)
+
+    return list(
+        await asyncio.gather(
+            *(
+                _async_create_agent(build, sub_agent_entry, ancestors)
+                for sub_agent_entry in sub_agent_entries
+            )
+        )
+    )
+
+
+SUPPORTED_SCHEMA_KEYS = frozenset(
+    {
+        # Gemini API does not support all of the OpenAPI schema
+        # SoT: https://ai.google.dev/api/caching#Schema
+        "type",
+        "format",
+        "description",
+        "nullable",
+        "enum",
+        "max_items",
+        "min_items",
+        "properties",
+        "required",
+        "items",
+    }
+)
+
+
+# Keys of scalar schema nodes that are copied as-is by _format_schema
+_SCALAR_PASSTHROUGH_KEYS = frozenset({"type", "description", "nullable"})
+_SCALAR_TYPES = frozenset({"string", "number", "integer", "boolean"})
+
+# Keys of an object schema node without properties that don't affect the result
+_STUB_OBJECT_KEYS = frozenset(
+    {
+        "type",
+        "description",
+        "nullable",
+        "properties",
+        "required",
+        "additionalProperties",
+    }
+)
+
+_CAMEL_RE = re.compile(r"(?<!^)(?=[A-Z])")
 
 
 def _camel_to_snake(name: str) -> str:
     """Convert camel case to snake case."""
-    return "".join(["_" + c.lower() if c.isupper() else c for c in name]).lstrip("_")
+    if name.islower():
+        return name
+    return _CAMEL_RE.sub("_", name).lower()
+
+
+# Formatted schemas keyed by a digest of the input schema content, least recently
+# used first. Tool schemas are deterministic so the same schemas are formatted on
+# every agent rebuild.
+_SCHEMA_CACHE: OrderedDict[str, Schema] = OrderedDict()
+_SCHEMA_CACHE_SIZE = 512
+
+
+def _schema_key(schema: dict[str, Any]) -> str:
+    """Return a stable digest of the schema content."""
+    return hashlib.blake2b(
+        json.dumps(schema, sort_keys=True, default=str).encode(), digest_size=16
+    ).hexdigest()
 
 
 def _format_schema(schema: dict[str, Any]) -> Schema:
     """Format the schema to be compatible with Gemini API."""
+    key = _schema_key(schema)
+    if (result := _SCHEMA_CACHE.get(key)) is not None:
+        _SCHEMA_CACHE.move_to_end(key)
+        return result
+    result = _SCHEMA_CACHE[key] = _format_schema_inner(schema)
+    if len(_SCHEMA_CACHE) > _SCHEMA_CACHE_SIZE:
+        _SCHEMA_CACHE.popitem(last=False)
+    return result
+
+
+# Gemini API does not support all formats, see: https://ai.google.dev/api/caching#Schema
+# formats that are not supported are ignored
+_SUPPORTED_FORMATS: dict[str, tuple[str, ...]] = {
+    "string": ("enum", "date-time"),
+    "number": ("float", "double"),
+    "integer": ("int32", "int64"),
+}
+
+# Sentinel returned by a key formatter to drop the key from the result
+_UNSUPPORTED = object()
+
+
+def _format_type(val: str, schema_type: str | None) -> str:
+    """Format the type of a schema node."""
+    return val.upper()
+
+
+def _format_format(val: str, schema_type: str | None) -> Any:
+    """Format the format of a schema node, dropping unsupported formats."""
+    if val in _SUPPORTED_FORMATS.get(schema_type or "", ()):
+        return val
+    return _UNSUPPORTED
+
+
+def _format_items(val: dict[str, Any], schema_type: str | None) -> Schema:
+    """Format the items of an array schema node."""
+    return _format_schema_inner(val)
+
+
+def _format_properties(
+    val: dict[str, dict[str, Any]], schema_type: str | None
+) -> dict[str, Schema]:
+    """Format the properties of an object schema node."""
+    return {k: _format_schema_inner(v) for k, v in val.items()}
+
+
+_KEY_FORMATTERS: dict[str, Callable[[Any, str | None], Any]] = {
+    "type": _format_type,
+    "format": _format_format,
+    "items": _format_items,
+    "properties": _format_properties,
+}
+
+
+def _format_schema_inner(schema: dict[str, Any]) -> Schema:
+    """Format the schema recursively without consulting the cache."""
     if subschemas := schema.get("allOf"):
         for subschema in subschemas:  # Gemini API does not support allOf keys
             if "type" in subschema:  # Fallback to first subschema with 'type' field
-                return _format_schema(subschema)
-        return _format_schema(
+                return _format_schema_inner(subschema)
+        return _format_schema_inner(
             subschemas[0]
         )  # Or, if not found, to any of the subschemas
 
+    schema_type = schema.get("type")
+    if (
+        schema_type == "object"
+        and not schema.get("properties")
+        and schema.keys() <= _STUB_OBJECT_KEYS
+    ):
+        # Skip the walk for parameterless objects, common for tools without arguments
+        result = {"type": "OBJECT"}
+        for key in ("description", "nullable"):
+            if key in schema:
+                result[key] = schema[key]
+        return _object_fallback(result)
+    if schema_type in _SCALAR_TYPES and schema.keys() <= _SCALAR_PASSTHROUGH_KEYS:
+        # Fast path for leaf nodes that only need the type to be uppercased
+        return cast(Schema, {**schema, "type": schema_type.upper()})
+
     result = {}
     for key, val in schema.items():
-        key = _camel_to_snake(key)
-        if key not in SUPPORTED_SCHEMA_KEYS:
+        # Most keys are already snake case so only convert on a miss
+        if (
+            key not in SUPPORTED_SCHEMA_KEYS
+            and (key := _camel_to_snake(key)) not in SUPPORTED_SCHEMA_KEYS
+        ):
             continue
-        if key == "type":
-            val = val.upper()
-        elif key == "format":
-            # Gemini API does not support all formats, see: https://ai.google.dev/api/caching#Schema
-            # formats that are not supported are ignored
-            if schema.get("type") == "string" and val not in ("enum", "date-time"):
-                continue
-            if schema.get("type") == "number" and val not in ("float", "double"):
+        if formatter := _KEY_FORMATTERS.get(key):
+            val = formatter(val, schema_type)
+            if val is _UNSUPPORTED:
                 continue
-            if schema.get("type") == "integer" and val not in ("int32", "int64"):
-                continue
-            if schema.get("type") not in ("string", "number", "integer"):
-                continue
-        elif key == "items":
-            val = _format_schema(val)
-        elif key == "properties":
-            val = {k: _format_schema(v) for k, v in val.items()}
         result[key] = val
 
     if result.get("enum") and result.get("type") != "STRING":
@@ -174,37 +352,46 @@ def _format_schema(schema: dict[str, Any]) -> Schema:
         result["enum"] = [str(item) for item in result["enum"]]
 
     if result.get("type") == "OBJECT" and not result.get("properties"):
-        # An object with undefined properties is not supported by Gemini API.
-        # Fallback to JSON string. This will probably fail for most tools that want it,
-        # but we don't have a better fallback strategy so far.
-        result["properties"] = {"json": {"type": "STRING"}}
-        result["required"] = []
+        return _object_fallback(result)
+    return cast(Schema, result)
+
+
+def _object_fallback(result: dict[str, Any]) -> Schema:
+    """Replace the properties of an object schema with a JSON string."""
+    # An object with undefined properties is not supported by Gemini API.
+    # Fallback to JSON string. This will probably fail for most tools that want it,
+    # but we don't have a better fallback strategy so far.
+    result["properties"] = {"json": {"type": "STRING"}}
+    result["required"] = []
     return cast(Schema, result)
 
 
+_ToolInput = llm.ToolInput
+
+
 class AdkLlmTool(BaseTool):
     """Home Assistant Tool wrapper."""
 
+    __slots__ = ("_call", "_declaration", "_llm_api", "_llm_tool", "_parameters")
+
     def __init__(
         self,
         llm_api: llm.APIInstance,
         tool: llm.Tool,
-        hass: HomeAssistant,
+        parameters: Schema | None,
         use_interactions_api: bool = False,
     ) -> None:
         """Initialize the Home Assistant Tool."""
         super().__init__(name=tool.name, description=tool.description)
         self._llm_api = llm_api
         self._llm_tool = tool
-        self._use_interactions_api = use_interactions_api
-        if tool.parameters.schema:
-            self._parameters = _format_schema(convert(tool.parameters))
-        else:
-            self._parameters = None
+        self._call = llm_api.async_call_tool
+        self._parameters = parameters
+        self._declaration = self._build_declaration(use_interactions_api)
 
-    def _get_declaration(self) -> FunctionDeclaration | None:
-        """Gets the OpenAPI specification of this tool in the form of a FunctionDeclaration."""
-        if self._use_interactions_api:
+    def _build_declaration(self, use_interactions_api: bool) -> FunctionDeclaration:
+        """Build the FunctionDeclaration for this tool."""
+        if use_interactions_api:
             # The Interactions API requires JSON Schema (lowercase types) and always
             # needs a parameters field. Use parameters_json_schema to bypass the
             # Gemini Schema model_dump which produces uppercase types (STRING, OBJECT, etc.)
@@ -225,34 +412,52 @@ class AdkLlmTool(BaseTool):
             parameters=self._parameters,
         )
 
+    def _get_declaration(self) -> FunctionDeclaration | None:
+        """Gets the OpenAPI specification of this tool in the form of a FunctionDeclaration."""
+        return self._declaration
+
     async def run_async(
         self, *, args: dict[str, Any], tool_context: ToolContext
     ) -> Any:
         """Run the tool asynchronously."""
-        tool_input = llm.ToolInput(
-            tool_name=self.name,
-            tool_args=args,
-        )
-        return await self._llm_api.async_call_tool(tool_input)
+        return await self._call(_ToolInput(tool_name=self.name, tool_args=args))
 
 
 async def _async_create_tools(
-    hass: HomeAssistant,
+    build: _AgentBuild,
     subentry: ConfigSubentry,
-    llm_context: llm.LLMContext,
     use_interactions_api: bool = False,
 ) -> list[BaseTool]:
     """Create tools for a given agent subentry."""
-    tools = []
-    if subentry.data.get("tools"):
-        llm_api = await llm.async_get_api(hass, subentry.data["tools"], llm_context)
-        for tool in llm_api.tools:
-            tools.append(
-                AdkLlmTool(
-                    llm_api, tool, hass, use_interactions_api=use_interactions_api
-                )
-            )
-    return tools
+    if not (api_ids := subentry.data.get("tools")):
+        return []
+    # Agents in the same tree often share a tool bundle, so look it up once.
+    # The lookup task is shared so concurrently built sub-agents wait on it.
+    key = tuple(api_ids)
+    if (llm_api_task := build.llm_apis.get(key)) is None:
+        llm_api_task = build.llm_apis[key] = build.hass.async_create_task(
+            llm.async_get_api(build.hass, api_ids, build.llm_context)
+        )
+    llm_api = await llm_api_task
+    return [
+        AdkLlmTool(
+            llm_api,
+            tool,
+            _get_tool_parameters(build, tool),
+            use_interactions_api=use_interactions_api,
+        )
+        for tool in llm_api.tools
+    ]
+
+
+def _get_tool_parameters(build: _AgentBuild, tool: llm.Tool) -> Schema | None:
+    """Return the converted parameters of a tool, once per build."""
+    key = id(tool)
+    if key not in build.tool_parameters:
+        build.tool_parameters[key] = (
+            _format_schema(convert(tool.parameters)) if tool.parameters.schema else None
+        )
+    return build.tool_parameters[key]
 
 
 def _create_memory_callback(
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any, cast
 
 import voluptuous as vol
@@ -36,9 +37,15 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
-RECOMMENDED_CONVERSATION_OPTIONS = {
-    CONF_MODEL: "gemini-3-flash-preview",
-}
+RECOMMENDED_CONVERSATION_OPTIONS: Mapping[str, Any] = MappingProxyType(
+    {
+        CONF_MODEL: "gemini-3-flash-preview",
+    }
+)
+
+_TEXT_SELECTOR = selector.TextSelector(selector.TextSelectorConfig())
+_MULTILINE_SELECTOR = selector.TextSelector(selector.TextSelectorConfig(multiline=True))
+_TEMPLATE_SELECTOR = selector.TemplateSelector()
 
 
 STEP_API_DATA_SCHEMA = vol.Schema(
@@ -187,12 +194,10 @@ class LLMSubentryFlowHandler(ConfigSubentryFlow):
         subagent_options: list[selector.SelectOptionDict] = _get_available_subagents(
             self.hass, current_subentry_id
         )
-        _LOGGER.debug("tool_options: %s", tool_options)
-        _LOGGER.debug("subagent_options: %s", subagent_options)
 
         if user_input is None:
             if self._is_new:
-                options: dict[str, Any] = RECOMMENDED_CONVERSATION_OPTIONS.copy()
+                options: dict[str, Any] = dict(RECOMMENDED_CONVERSATION_OPTIONS)
             else:
                 options = self._get_reconfigure_subentry().data.copy()
         else:
@@ -242,15 +247,15 @@ async def _options_schema_factory(
             vol.Required(
                 CONF_MODEL,
                 default=options.get(CONF_MODEL),
-            ): selector.TextSelector(selector.TextSelectorConfig()),
+            ): _TEXT_SELECTOR,
             vol.Required(
                 CONF_DESCRIPTION,
                 default=options.get(CONF_DESCRIPTION, ""),
-            ): selector.TextSelector(selector.TextSelectorConfig(multiline=True)),
+            ): _MULTILINE_SELECTOR,
             vol.Required(
                 CONF_INSTRUCTIONS,
                 default=options.get(CONF_INSTRUCTIONS, ""),
-            ): selector.TemplateSelector(),
+            ): _TEMPLATE_SELECTOR,
             vol.Optional(
                 CONF_TOOLS,
                 default=options.get(CONF_TOOLS, []),
@@ -292,12 +297,9 @@ def _get_available_subagents(
     hass: HomeAssistant, current_subentry_id: str | None = None
 ) -> list[selector.SelectOptionDict]:
     """Return a list of available subagents (LLM agents) from all google_adk config entries, excluding self."""
-    _LOGGER.debug("current_subentry_id: %s", current_subentry_id)
     options = []
     for entry in hass.config_entries.async_entries(DOMAIN):
-        _LOGGER.debug("entry: %s", entry)
         for subentry in entry.subentries.values():
-            _LOGGER.debug("subentry: %s", subentry)
             if (
                 current_subentry_id is not None
                 and subentry.subentry_id == current_subentry_id
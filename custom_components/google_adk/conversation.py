@@ -1,19 +1,22 @@
 """Conversation agent for the Rulebook agent."""
 
+import asyncio
 import logging
 from collections.abc import AsyncGenerator
+from contextlib import aclosing
 from functools import partial
 from typing import Literal
 
 from google import genai
 from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.events.event import Event
+from google.adk.models.base_llm import BaseLlm
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
 from google.genai.errors import APIError
 from homeassistant.components import conversation
-from homeassistant.config_entries import ConfigEntry, ConfigSubentry
+from homeassistant.config_entries import ConfigSubentry
 from homeassistant.const import MATCH_ALL
 from homeassistant.core import Context, HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
@@ -35,6 +38,16 @@ from .types import GoogleAdkConfigEntry
 _LOGGER = logging.getLogger(__name__)
 _ERROR_GETTING_RESPONSE = "Sorry, I had a problem getting a response from the Agent."
 
+# Coalesce streamed deltas until this many characters or seconds have built up
+_FLUSH_CHARS = 256
+_FLUSH_INTERVAL = 0.025
+
+# Events the runner may get ahead of the chat log before the producer waits
+_STREAM_QUEUE_SIZE = 16
+
+# Conversations remembered as having a session before the oldest is looked up again
+_MAX_SESSIONS = 256
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -53,27 +66,68 @@ async def async_setup_entry(
 
 async def _transform_stream(
     chat_log: conversation.ChatLog,
-    result: AsyncGenerator[Event],
+    queue: asyncio.Queue[Event | Exception | None],
 ) -> AsyncGenerator[conversation.AssistantContentDeltaDict]:
     """Transform an OpenAI delta stream into HA format."""
+    loop = asyncio.get_running_loop()
     start = True
-    total_thinking_yielded = ""
-    total_text_yielded = ""
+    total_thinking_seen = ""
+    total_text_seen = ""
+    thinking_buffer: list[str] = []
+    text_buffer: list[str] = []
+    buffered = 0
+    last_flush = loop.time()
+
+    def _flush() -> conversation.AssistantContentDeltaDict:
+        """Return a chunk with the buffered deltas and reset the buffer."""
+        nonlocal start, buffered, last_flush
+        chunk: conversation.AssistantContentDeltaDict = {}
+        if start:
+            chunk["role"] = "assistant"
+            start = False
+        if thinking_buffer:
+            chunk["thinking_content"] = "".join(thinking_buffer)
+            thinking_buffer.clear()
+        if text_buffer:
+            chunk["content"] = "".join(text_buffer)
+            text_buffer.clear()
+        buffered = 0
+        last_flush = loop.time()
+        return chunk
+
     try:
-        async for event in result:
-            _LOGGER.debug(
-                "Processing event: Author: %s, Type: %s, Final: %s, Content: %s",
-                event.author,
-                type(event).__name__,
-                event.is_final_response(),
-                event.content,
-            )
+        while True:
+            if buffered:
+                # Flush on time even while the runner is still working on the next event
+                try:
+                    async with asyncio.timeout_at(last_flush + _FLUSH_INTERVAL):
+                        item = await queue.get()
+                except TimeoutError:
+                    yield _flush()
+                    continue
+            else:
+                item = await queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            event = item
+
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(
+                    "Processing event: Author: %s, Type: %s, Final: %s, Content: %s",
+                    event.author,
+                    type(event).__name__,
+                    event.is_final_response(),
+                    event.content,
+                )
 
             if event.is_final_response() and not event.partial:
                 continue
 
             thinking_parts = []
             text_parts = []
+            has_tool_part = False
             if event.content and (response_parts := event.content.parts):
                 for part in response_parts:
                     if part.thought:
@@ -84,47 +138,61 @@ async def _transform_stream(
                         thinking_parts.append(
                             f"[Calling tool: {call.name}({call.args})]"
                         )
+                        has_tool_part = True
                     elif part.function_response:
                         resp = part.function_response
                         thinking_parts.append(
                             f"[Tool result: {resp.name} -> {resp.response}]"
                         )
+                        has_tool_part = True
                     elif part.text:
                         text_parts.append(part.text)
 
+            # Keep tool calls and results in their own deltas
+            if has_tool_part and buffered:
+                yield _flush()
+
             current_thinking = "".join(thinking_parts)
             current_text = "".join(text_parts)
 
-            chunk: conversation.AssistantContentDeltaDict = {}
-            if start:
-                chunk["role"] = "assistant"
-                start = False
-
-            # Extract deltas relative to total yielded so far in this stream
-            if current_thinking.startswith(total_thinking_yielded):
-                delta_thinking = current_thinking[len(total_thinking_yielded) :]
+            # Extract deltas relative to total seen so far in this stream
+            if current_thinking.startswith(total_thinking_seen):
+                delta_thinking = current_thinking[len(total_thinking_seen) :]
             else:
                 delta_thinking = current_thinking
 
             if delta_thinking:
-                chunk["thinking_content"] = delta_thinking
-                total_thinking_yielded += delta_thinking
+                thinking_buffer.append(delta_thinking)
+                buffered += len(delta_thinking)
+                total_thinking_seen += delta_thinking
 
-            if current_text.startswith(total_text_yielded):
-                delta_text = current_text[len(total_text_yielded) :]
+            if current_text.startswith(total_text_seen):
+                delta_text = current_text[len(total_text_seen) :]
             else:
                 delta_text = current_text
 
             if delta_text:
-                chunk["content"] = delta_text
-                total_text_yielded += delta_text
-
-            if (
-                chunk.get("content")
-                or chunk.get("thinking_content")
-                or chunk.get("role")
+                text_buffer.append(delta_text)
+                buffered += len(delta_text)
+                total_text_seen += delta_text
+
+            if start or (
+                buffered
+                and (
+                    has_tool_part
+                    or buffered >= _FLUSH_CHARS
+                    or loop.time() - last_flush >= _FLUSH_INTERVAL
+                )
             ):
-                yield chunk
+                yield _flush()
+
+        if buffered:
+            yield _flush()
+    except asyncio.QueueShutDown:
+        # The producer was cancelled before the runner finished
+        if buffered:
+            yield _flush()
+        raise HomeAssistantError(_ERROR_GETTING_RESPONSE) from None
     except (APIError, ValueError, HomeAssistantError) as err:
         _LOGGER.exception("Error sending message")
         if isinstance(err, APIError):
@@ -132,9 +200,51 @@ async def _transform_stream(
         else:
             message = type(err).__name__
         error = f"{_ERROR_GETTING_RESPONSE}: {message}"
+        # Emit whatever was received before the failure
+        if buffered:
+            yield _flush()
         raise HomeAssistantError(error) from err
 
 
+async def _async_produce_events(
+    events: AsyncGenerator[Event],
+    queue: asyncio.Queue[Event | Exception | None],
+) -> None:
+    """Move events from the runner onto the queue, ending with None when done."""
+    try:
+        async for event in events:
+            await queue.put(event)
+    except Exception as err:  # noqa: BLE001
+        await queue.put(err)
+    else:
+        await queue.put(None)
+    finally:
+        # Wake the reader even if this task is cancelled before the runner ends
+        queue.shutdown()
+        await events.aclose()
+
+
+async def _async_stream_response(
+    hass: HomeAssistant,
+    chat_log: conversation.ChatLog,
+    events: AsyncGenerator[Event],
+) -> AsyncGenerator[conversation.AssistantContentDeltaDict]:
+    """Transform the runner events, which are read by a single producer task."""
+    queue: asyncio.Queue[Event | Exception | None] = asyncio.Queue(
+        maxsize=_STREAM_QUEUE_SIZE
+    )
+    producer = hass.async_create_task(
+        _async_produce_events(events, queue), "google_adk event producer"
+    )
+    try:
+        async with aclosing(_transform_stream(chat_log, queue)) as stream:
+            async for chunk in stream:
+                yield chunk
+    finally:
+        producer.cancel()
+        await asyncio.wait((producer,))
+
+
 class GoogleAdkConversationEntity(
     conversation.ConversationEntity, conversation.AbstractConversationAgent
 ):
@@ -161,6 +271,10 @@ class GoogleAdkConversationEntity(
             entry_type=dr.DeviceEntryType.SERVICE,
         )
         self._session_service = InMemorySessionService()
+        # Conversations known to have a session, oldest first, used as an ordered set
+        self._sessions: dict[tuple[str, str, str], None] = {}
+        # Models and their API clients are reused across turns
+        self._models: dict[tuple[str, bool], BaseLlm] = {}
         self._memory_service: LocalFileMemoryService | None = None
 
     @property
@@ -195,13 +309,13 @@ class GoogleAdkConversationEntity(
             model_id=model_id,
         )
         conversation.async_set_agent(self.hass, self.entry, self)
-        self.entry.async_on_unload(
-            self.entry.add_update_listener(self._async_entry_update_listener)
-        )
 
     async def async_will_remove_from_hass(self) -> None:
         """When entity will be removed from Home Assistant."""
         conversation.async_unset_agent(self.hass, self.entry)
+        # A reload creates a new store that would not see the pending delayed write
+        if self._memory_service is not None:
+            await self._memory_service.async_flush()
         await super().async_will_remove_from_hass()
 
     async def _async_handle_message(
@@ -242,6 +356,27 @@ class GoogleAdkConversationEntity(
             continue_conversation=chat_log.continue_conversation,
         )
 
+    async def _async_ensure_session(
+        self, agent_id: str, user_id: str, conversation_id: str
+    ) -> None:
+        """Create the session for a conversation if it does not exist yet."""
+        key = (agent_id, user_id, conversation_id)
+        if key in self._sessions:
+            return
+        if not await self._session_service.get_session(
+            app_name=agent_id,
+            user_id=user_id,
+            session_id=conversation_id,
+        ):
+            await self._session_service.create_session(
+                app_name=agent_id,
+                user_id=user_id,
+                session_id=conversation_id,
+            )
+        self._sessions[key] = None
+        if len(self._sessions) > _MAX_SESSIONS:
+            del self._sessions[next(iter(self._sessions))]
+
     async def _async_handle_chat_log(
         self,
         chat_log: conversation.ChatLog,
@@ -251,34 +386,18 @@ class GoogleAdkConversationEntity(
     ) -> None:
         """Generate an answer for the chat log."""
         user_id = context.user_id or "unknown_user"
-        session = await self._session_service.get_session(
-            app_name=agent_id,
-            user_id=user_id,
-            session_id=chat_log.conversation_id,
+        session_key = (agent_id, user_id, chat_log.conversation_id)
+        await self._async_ensure_session(*session_key)
+        _LOGGER.debug(
+            "Handling turn for session %s (app: %s, user: %s)",
+            chat_log.conversation_id,
+            agent_id,
+            user_id,
         )
-        if not session:
-            session = await self._session_service.create_session(
-                app_name=agent_id,
-                user_id=user_id,
-                session_id=chat_log.conversation_id,
-            )
-
-        _LOGGER.info("--- Examining Session Properties ---")
-        _LOGGER.info(f"ID (`id`):                {session.id}")
-        _LOGGER.info(f"Application Name (`app_name`): {session.app_name}")
-        _LOGGER.info(f"User ID (`user_id`):         {session.user_id}")
-        _LOGGER.info(
-            f"State (`state`):           {session.state}"
-        )  # Note: Only shows initial state here
-        _LOGGER.info(f"Events (`events`):         {session.events}")  # Initially empty
-        _LOGGER.info(
-            f"Last Update (`last_update_time`): {session.last_update_time:.2f}"
-        )
-        _LOGGER.info("---------------------------------")
 
         try:
             llm_agent = await agent.async_create(
-                self.hass, self._subentry, llm_context=llm_context
+                self.hass, self._subentry, llm_context=llm_context, models=self._models
             )
         except Exception as err:
             _LOGGER.error("Error creating LLM agent: %s", err)
@@ -315,17 +434,12 @@ class GoogleAdkConversationEntity(
             raise
 
         try:
-            async for chunk in chat_log.async_add_delta_content_stream(
-                self.entity_id, _transform_stream(chat_log, event_stream)
+            async for _ in chat_log.async_add_delta_content_stream(
+                self.entity_id,
+                _async_stream_response(self.hass, chat_log, event_stream),
             ):
-                _LOGGER.debug("Chunk processed")
+                pass
         except Exception as err:
             _LOGGER.error("Error during chat log handling: %s", err)
+            self._sessions.pop(session_key, None)
             raise
-
-    async def _async_entry_update_listener(
-        self, hass: HomeAssistant, entry: ConfigEntry
-    ) -> None:
-        """Handle options update."""
-        # Reload as we update device info + entity name + supported features
-        await hass.config_entries.async_reload(entry.entry_id)
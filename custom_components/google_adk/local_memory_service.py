@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
 import re
 from datetime import UTC, datetime
@@ -15,7 +16,7 @@ from google.adk.memory.base_memory_service import (
 )
 from google.adk.memory.memory_entry import MemoryEntry
 from google.genai.types import Content, Part
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.storage import Store
 
 if TYPE_CHECKING:
@@ -23,7 +24,7 @@ if TYPE_CHECKING:
 
 _LOGGER = logging.getLogger(__name__)
 
-STORAGE_VERSION = 1
+STORAGE_VERSION = 2
 STORAGE_KEY = "google_adk.memory"
 
 _SUMMARIZE_MEMORY_PROMPT = (
@@ -31,11 +32,21 @@ _SUMMARIZE_MEMORY_PROMPT = (
     "for future interactions. Be concise."
 )
 
+# Coalesce bursts of memory updates into a single write
+SAVE_DELAY = 10
+
 SUMMARIZATION_THRESHOLD = 25
 METADATA_KEY = "__metadata__"
 SUMMARIES_KEY = "__summaries__"
 
+# Authors whose events are never stored, to avoid feeding summaries back in
+_SKIP_AUTHORS = frozenset({"memory_summarizer"})
+
+# Unicode aware so non-English conversations remain searchable
+_WORD_RE = re.compile(r"\w+")
+
 
+@functools.lru_cache(maxsize=256)
 def _user_key(app_name: str, user_id: str) -> str:
     """Create a unique key for the user and app."""
     return f"{app_name}/{user_id}"
@@ -43,7 +54,68 @@ def _user_key(app_name: str, user_id: str) -> str:
 
 def _extract_words_lower(text: str) -> set[str]:
     """Extracts words (including digits) from a string and converts them to lowercase."""
-    return {word.lower() for word in re.findall(r"\w+", text)}
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def _new_columns() -> dict[str, list[Any]]:
+    """Return empty columns for a list of stored events."""
+    return {"timestamps": [], "authors": [], "roles": [], "texts": [], "words": []}
+
+
+def _append_event(
+    columns: dict[str, list[Any]],
+    timestamp: str | None,
+    author: str | None,
+    role: str | None,
+    texts: list[str],
+) -> None:
+    """Append an event to the stored columns."""
+    columns["timestamps"].append(timestamp)
+    columns["authors"].append(author)
+    columns["roles"].append(role)
+    columns["texts"].append(texts)
+    columns["words"].append(sorted(_extract_words_lower(" ".join(texts))))
+
+
+def _memory_entry(columns: dict[str, list[Any]], idx: int) -> MemoryEntry:
+    """Build a memory entry from a stored event."""
+    return MemoryEntry(
+        content=Content(
+            role=columns["roles"][idx],
+            parts=[Part(text=text) for text in columns["texts"][idx]],
+        ),
+        author=columns["authors"][idx],
+        timestamp=columns["timestamps"][idx] or "",
+    )
+
+
+class _MemoryStore(Store[dict[str, Any]]):
+    """Store that migrates memory saved as per-event dicts to columns."""
+
+    async def _async_migrate_func(
+        self,
+        old_major_version: int,
+        old_minor_version: int,
+        old_data: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Migrate to the new version."""
+        if old_major_version == 1:
+            for user_data in old_data.values():
+                for key, events in user_data.items():
+                    if key == METADATA_KEY:
+                        continue
+                    columns = _new_columns()
+                    for event_data in events:
+                        content_data = event_data.get("content", {})
+                        _append_event(
+                            columns,
+                            event_data.get("timestamp"),
+                            event_data.get("author"),
+                            content_data.get("role"),
+                            [p.get("text", "") for p in content_data.get("parts", [])],
+                        )
+                    user_data[key] = columns
+        return old_data
 
 
 class LocalFileMemoryService(BaseMemoryService):
@@ -59,24 +131,71 @@ class LocalFileMemoryService(BaseMemoryService):
     ) -> None:
         """Initialize the local file memory service."""
         self._hass = hass
-        self._store = Store(hass, STORAGE_VERSION, storage_key)
+        self._store = _MemoryStore(hass, STORAGE_VERSION, storage_key)
         self._lock = asyncio.Lock()
         self._session_events = {}
+        # Inverted index of user_key -> word -> {(session_id, event_index)}, where
+        # summaries are indexed under SUMMARIES_KEY
+        self._index: dict[str, dict[str, set[tuple[str, int]]]] = {}
         self._loaded = False
+        self._load_lock = asyncio.Lock()
         self._summarize = summarize
         self._client = client
         self._model_id = model_id
         self._summarizing_lock = asyncio.Lock()
+        self._summarizing: set[str] = set()
 
     async def _async_load(self) -> None:
         """Load memory from storage."""
         if self._loaded:
             return
 
-        data = await self._store.async_load()
-        if data:
-            self._session_events = data
-        self._loaded = True
+        # Concurrent first calls wait for a single read of the store
+        async with self._load_lock:
+            if self._loaded:
+                return
+            data = await self._store.async_load()
+            if data:
+                self._session_events = data
+                for user_key, user_data in data.items():
+                    for session_id, columns in user_data.items():
+                        if session_id == METADATA_KEY:
+                            continue
+                        self._index_events(user_key, session_id, columns)
+            self._loaded = True
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return self._session_events
+
+    async def async_flush(self) -> None:
+        """Write pending memory changes to storage immediately."""
+        # Nothing was loaded, so saving would overwrite the stored memory
+        if not self._loaded:
+            return
+        await self._store.async_save(self._session_events)
+
+    def _index_events(
+        self, user_key: str, session_id: str, columns: dict[str, list[Any]]
+    ) -> None:
+        """Add the words of a session's events to the search index."""
+        index = self._index.setdefault(user_key, {})
+        for idx, words in enumerate(columns["words"]):
+            for word in words:
+                index.setdefault(word, set()).add((session_id, idx))
+
+    def _unindex_events(
+        self, user_key: str, session_id: str, columns: dict[str, list[Any]]
+    ) -> None:
+        """Remove the words of a session's events from the search index."""
+        index = self._index.get(user_key, {})
+        for idx, words in enumerate(columns["words"]):
+            for word in words:
+                if (postings := index.get(word)) is not None:
+                    postings.discard((session_id, idx))
+                    if not postings:
+                        del index[word]
 
     async def _async_background_summarize(self, app_name: str, user_id: str) -> None:
         """Perform summarization in the background."""
@@ -87,7 +206,10 @@ class LocalFileMemoryService(BaseMemoryService):
 
         # Avoid concurrent summarization for the same user
         async with self._summarizing_lock:
-            await self._async_load()
+            if not self._loaded:
+                await self._async_load()
+            if user_key in self._summarizing:
+                return
             user_data = self._session_events.get(user_key, {})
             metadata = user_data.get(METADATA_KEY, {})
 
@@ -98,102 +220,117 @@ class LocalFileMemoryService(BaseMemoryService):
                 return
 
             # Build transcript from all sessions
-            transcript = ""
+            parts: list[str] = []
             # Get existing summaries
-            summaries = user_data.get(SUMMARIES_KEY, [])
-            for summary in summaries:
-                if (
-                    summary_text := summary.get("content", {})
-                    .get("parts", [{}])[0]
-                    .get("text")
-                ):
-                    transcript += f"Previous Summary: {summary_text}\n"
-
-            # Get new sessions since last summary
-            # Note: This is an approximation since we don't have per-event turn counts easily without
-            # more complex metadata. For now, we'll just take all sessions.
-            # In a more advanced version, we'd track which sessions are already summarized.
-            for session_id, events in user_data.items():
+            summaries = user_data.get(SUMMARIES_KEY, _new_columns())
+            for texts in summaries["texts"]:
+                if texts and (summary_text := texts[0]):
+                    parts.append(f"Previous Summary: {summary_text}\n")
+
+            # Get events added since the last summary, which already covers the rest
+            summarized_counts = metadata.get("summarized_event_counts", {})
+            event_counts: dict[str, int] = {}
+            for session_id, columns in user_data.items():
                 if session_id in (METADATA_KEY, SUMMARIES_KEY):
                     continue
-                for event in events:
-                    parts = event.get("content", {}).get("parts", [])
-                    text = " ".join([p.get("text", "") for p in parts if p.get("text")])
+                start = summarized_counts.get(session_id, 0)
+                event_counts[session_id] = len(columns["texts"])
+                for author, texts in zip(
+                    columns["authors"][start:], columns["texts"][start:], strict=True
+                ):
+                    text = " ".join([t for t in texts if t])
                     if text:
-                        transcript += f"{event.get('author', 'unknown')}: {text}\n"
+                        parts.append(f"{author or 'unknown'}: {text}\n")
 
-            if not transcript:
+            if not parts:
                 return
+            transcript = "".join(parts)
+            self._summarizing.add(user_key)
+
+        # The model call runs outside the lock so other users are not blocked
+        try:
+            _LOGGER.debug("Summarizing memory for user in background: %s", user_id)
+            summary_prompt = f"{transcript}\n\n{_SUMMARIZE_MEMORY_PROMPT}"
+            response = await self._client.aio.models.generate_content(
+                model=self._model_id, contents=summary_prompt
+            )
+            summary_text = response.text
+
+            # Update summaries (we replace or append? User said "summarize every 50 turns")
+            # Usually we want to keep it condensed, so we might replace the old summary with a new one
+            # that includes the old summary's context + new events.
+            new_summaries = _new_columns()
+            _append_event(
+                new_summaries,
+                datetime.now(UTC).isoformat(),
+                "memory_summarizer",
+                "model",
+                [f"Memory Summary: {summary_text}"],
+            )
 
-            try:
-                _LOGGER.debug("Summarizing memory for user in background: %s", user_id)
-                summary_prompt = f"{transcript}\n\n{_SUMMARIZE_MEMORY_PROMPT}"
-                response = await self._client.aio.models.generate_content(
-                    model=self._model_id, contents=summary_prompt
-                )
-                summary_text = response.text
-
-                # Update summaries (we replace or append? User said "summarize every 50 turns")
-                # Usually we want to keep it condensed, so we might replace the old summary with a new one
-                # that includes the old summary's context + new events.
-                new_summary_event = {
-                    "timestamp": datetime.now(UTC).isoformat(),
-                    "author": "memory_summarizer",
-                    "content": {
-                        "role": "model",
-                        "parts": [{"text": f"Memory Summary: {summary_text}"}],
-                    },
-                }
-
+            async with self._lock:
                 # For now, let's keep it simple: replace previous summaries with the new one
                 # to keep memory usage low, since the new summary should incorporate the old one.
-                user_data[SUMMARIES_KEY] = [new_summary_event]
+                if (previous_summaries := user_data.get(SUMMARIES_KEY)) is not None:
+                    self._unindex_events(user_key, SUMMARIES_KEY, previous_summaries)
+                user_data[SUMMARIES_KEY] = new_summaries
+                self._index_events(user_key, SUMMARIES_KEY, new_summaries)
+                metadata = user_data.setdefault(METADATA_KEY, {})
                 metadata["last_summarized_turn_count"] = total_turns
-                user_data[METADATA_KEY] = metadata
+                metadata["summarized_event_counts"] = event_counts
 
-                await self._store.async_save(self._session_events)
-                _LOGGER.debug("Background summarization complete for user: %s", user_id)
-            except Exception as e:  # noqa: BLE001
-                _LOGGER.error("Failed to perform background summarization: %s", e)
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+            _LOGGER.debug("Background summarization complete for user: %s", user_id)
+        except Exception as e:  # noqa: BLE001
+            _LOGGER.error("Failed to perform background summarization: %s", e)
+        finally:
+            self._summarizing.discard(user_key)
 
     @override
     async def add_session_to_memory(self, session: Session) -> None:
         """Add a session to memory."""
         _LOGGER.debug("Adding session to memory: %s", session.id)
-        await self._async_load()
+        if not self._loaded:
+            await self._async_load()
 
         user_key = _user_key(session.app_name, session.user_id)
 
-        # Convert events to a serializable format
-        serializable_events = []
+        # Convert events to serializable columns
+        columns = _new_columns()
         new_turns = 0
         for event in session.events:
-            if not event.content or not event.content.parts:
+            if (
+                not event.content
+                or not event.content.parts
+                or event.author in _SKIP_AUTHORS
+            ):
+                continue
+            # Tool calls and responses carry no text worth remembering
+            if not (texts := [part.text for part in event.content.parts if part.text]):
                 continue
 
-            event_data = {
-                "timestamp": datetime.fromtimestamp(event.timestamp, tz=UTC).isoformat()
+            _append_event(
+                columns,
+                datetime.fromtimestamp(event.timestamp, tz=UTC).isoformat()
                 if event.timestamp
                 else None,
-                "author": event.author,
-                "content": {
-                    "role": event.content.role,
-                    "parts": [
-                        {"text": part.text} for part in event.content.parts if part.text
-                    ],
-                },
-            }
-            serializable_events.append(event_data)
+                event.author,
+                event.content.role,
+                texts,
+            )
             new_turns += 1
 
-        if not serializable_events:
+        if not new_turns:
             return
 
         async with self._lock:
             if user_key not in self._session_events:
                 self._session_events[user_key] = {}
             user_data = self._session_events[user_key]
-            user_data[session.id] = serializable_events
+            if (previous_columns := user_data.get(session.id)) is not None:
+                self._unindex_events(user_key, session.id, previous_columns)
+            user_data[session.id] = columns
+            self._index_events(user_key, session.id, columns)
 
             # Update turn count metadata
             metadata = user_data.get(METADATA_KEY, {})
@@ -201,7 +338,7 @@ class LocalFileMemoryService(BaseMemoryService):
             metadata["total_turns"] = total_turns
             user_data[METADATA_KEY] = metadata
 
-        await self._store.async_save(self._session_events)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
 
         # Check for background summarization
         last_summarized = metadata.get("last_summarized_turn_count", 0)
@@ -216,47 +353,28 @@ class LocalFileMemoryService(BaseMemoryService):
     ) -> SearchMemoryResponse:
         """Search memory for relevant sessions and summaries."""
         _LOGGER.debug("Searching memory for query: %s", query)
-        await self._async_load()
+        response = SearchMemoryResponse()
+        if not (words_in_query := _extract_words_lower(query)):
+            return response
+
+        if not self._loaded:
+            await self._async_load()
         user_key = _user_key(app_name, user_id)
 
         async with self._lock:
             user_data = self._session_events.get(user_key, {})
-
-        words_in_query = _extract_words_lower(query)
-        response = SearchMemoryResponse()
-
-        # Helper to search a list of events and add to response
-        def _search_events(events: list[dict[str, Any]]) -> None:
-            for event_data in events:
-                content_data = event_data.get("content", {})
-                parts = content_data.get("parts", [])
-                text_content = " ".join([p.get("text", "") for p in parts])
-
-                words_in_event = _extract_words_lower(text_content)
-                if not words_in_event:
-                    continue
-
-                if any(query_word in words_in_event for query_word in words_in_query):
-                    reconstructed_content = Content(
-                        role=content_data.get("role"),
-                        parts=[Part(text=p.get("text", "")) for p in parts],
-                    )
-
-                    response.memories.append(
-                        MemoryEntry(
-                            content=reconstructed_content,
-                            author=event_data.get("author"),
-                            timestamp=event_data.get("timestamp") or "",
-                        )
-                    )
-
-        # Search summaries
-        _search_events(user_data.get(SUMMARIES_KEY, []))
-
-        # Search regular sessions
-        for key, session_events in user_data.items():
-            if key in (METADATA_KEY, SUMMARIES_KEY):
-                continue
-            _search_events(session_events)
+            index = self._index.get(user_key, {})
+
+        if words_in_query.isdisjoint(index):
+            return response
+        hits: set[tuple[str, int]] = set()
+        for word in words_in_query:
+            hits.update(index.get(word, ()))
+
+        # Return summaries first, then sessions in stored session and event order
+        order = {session_id: i for i, session_id in enumerate(user_data)}
+        order[SUMMARIES_KEY] = -1
+        for session_id, idx in sorted(hits, key=lambda hit: (order[hit[0]], hit[1])):
+            response.memories.append(_memory_entry(user_data[session_id], idx))
 
         return response
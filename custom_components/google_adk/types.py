@@ -1,5 +1,16 @@
 """Types for the Rulebook integration."""
 
+from dataclasses import dataclass
+
 from homeassistant.config_entries import ConfigEntry
 
-type GoogleAdkConfigEntry = ConfigEntry[None]
+
+@dataclass
+class GoogleAdkData:
+    """Runtime data for a Google ADK config entry."""
+
+    fingerprint: str
+    """Digest of the settings the entry was last set up with."""
+
+
+type GoogleAdkConfigEntry = ConfigEntry[GoogleAdkData]
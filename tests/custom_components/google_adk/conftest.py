@@ -0,0 +1,36 @@
+"""Fixtures for the local file memory service tests."""
+
+from collections import defaultdict
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.google_adk import local_memory_service
+from custom_components.google_adk.local_memory_service import STORAGE_KEY
+
+
+def _create_mock_store() -> MagicMock:
+    """Return a mock store that starts out empty."""
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value=None)
+    store.async_delay_save = MagicMock()
+    store.async_save = AsyncMock()
+    return store
+
+
+@pytest.fixture(name="mock_stores")
+def mock_stores_fixture(monkeypatch: pytest.MonkeyPatch) -> dict[str, MagicMock]:
+    """Replace the memory store with mocks, keyed by storage key, to avoid file I/O."""
+    stores: defaultdict[str, MagicMock] = defaultdict(_create_mock_store)
+    monkeypatch.setattr(
+        local_memory_service,
+        "_MemoryStore",
+        lambda hass, version, key: stores[key],
+    )
+    return stores
+
+
+@pytest.fixture(name="mock_store")
+def mock_store_fixture(mock_stores: dict[str, MagicMock]) -> MagicMock:
+    """Return the mock store for the default storage key."""
+    return mock_stores[STORAGE_KEY]
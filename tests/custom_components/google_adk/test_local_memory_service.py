@@ -1,276 +1,451 @@
 """Tests for the local file memory service."""
 
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
 
+import pytest
 from google.adk.events.event import Event
 from google.adk.sessions import Session
-from google.genai.types import Content, Part
+from google.genai.types import Content, FunctionCall, Part
 from homeassistant.core import HomeAssistant
 
 from custom_components.google_adk.local_memory_service import LocalFileMemoryService
 
-
-async def test_memory_service_save_load(hass: HomeAssistant) -> None:
+_APPLE_SESSION = Session(
+    id="test_session",
+    app_name="test_app",
+    user_id="test_user",
+    events=[Event(author="user", content=Content(parts=[Part(text="I love apples.")]))],
+)
+_CAT_SESSION = Session(
+    id="s1",
+    app_name="app",
+    user_id="user",
+    events=[
+        Event(author="user", content=Content(parts=[Part(text="My cat is black.")]))
+    ],
+)
+_DOGS_SESSION = Session(
+    id="s2",
+    app_name="app",
+    user_id="user",
+    events=[Event(author="user", content=Content(parts=[Part(text="I love dogs.")]))],
+)
+_SECRET_SESSION = Session(
+    id="s1",
+    app_name="app",
+    user_id="user",
+    events=[
+        Event(author="user", content=Content(parts=[Part(text="Secret code is 1234.")]))
+    ],
+)
+_PHONE_SESSION = Session(
+    id="s1",
+    app_name="app",
+    user_id="user",
+    events=[
+        Event(author="user", content=Content(parts=[Part(text="My phone is 123456.")]))
+    ],
+)
+_TURNS_SESSION = Session(
+    id="session1",
+    app_name="app",
+    user_id="user",
+    events=[
+        Event(author="user", content=Content(parts=[Part(text=f"Turn {i}")]))
+        for i in range(24)
+    ],
+)
+_FINAL_TURN_SESSION = Session(
+    id="session2",
+    app_name="app",
+    user_id="user",
+    events=[Event(author="user", content=Content(parts=[Part(text="Final turn")]))],
+)
+_LATER_TURNS_SESSION = Session(
+    id="session3",
+    app_name="app",
+    user_id="user",
+    events=[
+        Event(author="user", content=Content(parts=[Part(text=f"Later turn {i}")]))
+        for i in range(25)
+    ],
+)
+_OTHER_USER_SESSION = Session(
+    id="session1",
+    app_name="app",
+    user_id="other_user",
+    events=[
+        Event(author="user", content=Content(parts=[Part(text=f"Other turn {i}")]))
+        for i in range(25)
+    ],
+)
+
+
+async def test_memory_service_save_load(
+    hass: HomeAssistant, mock_store: MagicMock
+) -> None:
     """Test saving and loading sessions."""
+    service = LocalFileMemoryService(hass)
 
-    # Mock Store to verify logic without file I/O
-    with patch(
-        "custom_components.google_adk.local_memory_service.Store"
-    ) as mock_store_cls:
-        mock_store = mock_store_cls.return_value
-        mock_store.async_load = AsyncMock(return_value=None)
-        mock_store.async_save = AsyncMock()
-
-        service = LocalFileMemoryService(hass)
-
-        session = Session(
-            id="test_session",
-            app_name="test_app",
-            user_id="test_user",
-            events=[
-                Event(
-                    author="user", content=Content(parts=[Part(text="I love apples.")])
-                )
-            ],
-        )
-
-        await service.add_session_to_memory(session)
+    await service.add_session_to_memory(_APPLE_SESSION)
 
-        # Verify save was called
-        mock_store.async_save.assert_called_once()
-        saved_data = mock_store.async_save.call_args[0][0]
-        assert "test_app/test_user" in saved_data
-        assert "test_session" in saved_data["test_app/test_user"]
+    # Verify save was called
+    mock_store.async_delay_save.assert_called_once()
+    saved_data = mock_store.async_delay_save.call_args[0][0]()
+    assert "test_app/test_user" in saved_data
+    assert "test_session" in saved_data["test_app/test_user"]
 
-        # Now simulate loading from this data in a new service
-        mock_store.async_load.return_value = saved_data
+    # Now simulate loading from this data in a new service
+    mock_store.async_load.return_value = saved_data
 
-        service2 = LocalFileMemoryService(hass)
-        response = await service2.search_memory(
-            app_name="test_app", user_id="test_user", query="apples"
-        )
+    service2 = LocalFileMemoryService(hass)
+    response = await service2.search_memory(
+        app_name="test_app", user_id="test_user", query="apples"
+    )
 
-        assert len(response.memories) == 1
-        memory = response.memories[0]
-        assert memory.content is not None
-        assert memory.content.parts is not None
-        assert len(memory.content.parts) > 0
-        assert memory.content.parts[0].text == "I love apples."
+    assert len(response.memories) == 1
+    memory = response.memories[0]
+    assert memory.content is not None
+    assert memory.content.parts is not None
+    assert len(memory.content.parts) > 0
+    assert memory.content.parts[0].text == "I love apples."
 
 
+@pytest.mark.usefixtures("mock_store")
 async def test_memory_service_search(hass: HomeAssistant) -> None:
     """Test searching memory."""
-    with patch(
-        "custom_components.google_adk.local_memory_service.Store"
-    ) as mock_store_cls:
-        mock_store = mock_store_cls.return_value
-        mock_store.async_load = AsyncMock(return_value=None)
-        mock_store.async_save = AsyncMock()
+    service = LocalFileMemoryService(hass)
+
+    # The mocked store has no shared side effects, so the independent adds and
+    # searches can run concurrently.
+    await asyncio.gather(
+        service.add_session_to_memory(_CAT_SESSION),
+        service.add_session_to_memory(_DOGS_SESSION),
+    )
+
+    cat_response, dogs_response, bird_response = await asyncio.gather(
+        service.search_memory(app_name="app", user_id="user", query="cat"),
+        service.search_memory(app_name="app", user_id="user", query="dogs"),
+        service.search_memory(app_name="app", user_id="user", query="bird"),
+    )
+
+    # Search for "cat"
+    assert len(cat_response.memories) == 1
+    memory = cat_response.memories[0]
+    assert memory.content is not None
+    assert memory.content.parts is not None
+    assert len(memory.content.parts) > 0
+    assert (text := memory.content.parts[0].text) is not None
+    assert "cat" in text
+
+    # Search for "dogs"
+    assert len(dogs_response.memories) == 1
+    memory = dogs_response.memories[0]
+    assert memory.content is not None
+    assert memory.content.parts is not None
+    assert len(memory.content.parts) > 0
+    assert (text := memory.content.parts[0].text) is not None
+    assert "dogs" in text
+
+    # Search for something unrelated
+    assert len(bird_response.memories) == 0
+
+
+@pytest.mark.usefixtures("mock_stores")
+async def test_memory_service_isolation(hass: HomeAssistant) -> None:
+    """Test memory isolation between different storage keys."""
+    service1 = LocalFileMemoryService(hass, storage_key="key1")
+    service2 = LocalFileMemoryService(hass, storage_key="key2")
 
-        service = LocalFileMemoryService(hass)
+    await service1.add_session_to_memory(_SECRET_SESSION)
 
-        session1 = Session(
-            id="s1",
-            app_name="app",
-            user_id="user",
-            events=[
-                Event(
-                    author="user",
-                    content=Content(parts=[Part(text="My cat is black.")]),
-                )
-            ],
-        )
-        session2 = Session(
-            id="s2",
-            app_name="app",
-            user_id="user",
-            events=[
-                Event(author="user", content=Content(parts=[Part(text="I love dogs.")]))
-            ],
-        )
+    # Service 1 should find it
+    response1 = await service1.search_memory(
+        app_name="app", user_id="user", query="1234"
+    )
+    assert len(response1.memories) == 1
 
-        await service.add_session_to_memory(session1)
-        await service.add_session_to_memory(session2)
+    # Service 2 should NOT find it
+    response2 = await service2.search_memory(
+        app_name="app", user_id="user", query="1234"
+    )
+    assert len(response2.memories) == 0
 
-        # Search for "cat"
-        response = await service.search_memory(
-            app_name="app", user_id="user", query="cat"
-        )
-        assert len(response.memories) == 1
-        memory = response.memories[0]
-        assert memory.content is not None
-        assert memory.content.parts is not None
-        assert len(memory.content.parts) > 0
-        assert (text := memory.content.parts[0].text) is not None
-        assert "cat" in text
-
-        # Search for "dogs"
-        response = await service.search_memory(
-            app_name="app", user_id="user", query="dogs"
-        )
-        assert len(response.memories) == 1
-        memory = response.memories[0]
-        assert memory.content is not None
-        assert memory.content.parts is not None
-        assert len(memory.content.parts) > 0
-        assert (text := memory.content.parts[0].text) is not None
-        assert "dogs" in text
-
-        # Search for something unrelated
-        response = await service.search_memory(
-            app_name="app", user_id="user", query="bird"
-        )
-        assert len(response.memories) == 0
 
+async def test_memory_service_concurrent_load(
+    hass: HomeAssistant, mock_store: MagicMock
+) -> None:
+    """Test that concurrent first calls share a single load of the store."""
+    release = asyncio.Event()
 
-async def test_memory_service_isolation(hass: HomeAssistant) -> None:
-    """Test memory isolation between different storage keys."""
-    with patch(
-        "custom_components.google_adk.local_memory_service.Store"
-    ) as mock_store_cls:
-        # We need to handle two different instances of Store
-        mock_stores = {}
-
-        def get_mock_store(hass, version, key):
-            if key not in mock_stores:
-                m = MagicMock()
-                m.async_load = AsyncMock(return_value=None)
-                m.async_save = AsyncMock()
-                mock_stores[key] = m
-            return mock_stores[key]
-
-        mock_store_cls.side_effect = get_mock_store
-
-        service1 = LocalFileMemoryService(hass, storage_key="key1")
-        service2 = LocalFileMemoryService(hass, storage_key="key2")
-
-        session = Session(
-            id="s1",
-            app_name="app",
-            user_id="user",
-            events=[
-                Event(
-                    author="user",
-                    content=Content(parts=[Part(text="Secret code is 1234.")]),
-                )
-            ],
-        )
+    async def _async_load() -> dict[str, Any]:
+        await release.wait()
+        return {"app/user": {}}
 
-        await service1.add_session_to_memory(session)
+    mock_store.async_load.side_effect = _async_load
+    service = LocalFileMemoryService(hass)
 
-        # Service 1 should find it
-        response1 = await service1.search_memory(
-            app_name="app", user_id="user", query="1234"
-        )
-        assert len(response1.memories) == 1
+    add = asyncio.create_task(service.add_session_to_memory(_APPLE_SESSION))
+    search = asyncio.create_task(
+        service.search_memory(app_name="app", user_id="user", query="apples")
+    )
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(add, search)
 
-        # Service 2 should NOT find it
-        response2 = await service2.search_memory(
-            app_name="app", user_id="user", query="1234"
-        )
-        assert len(response2.memories) == 0
+    mock_store.async_load.assert_awaited_once()
+    response = await service.search_memory(
+        app_name="test_app", user_id="test_user", query="apples"
+    )
+    assert len(response.memories) == 1
 
 
+@pytest.mark.usefixtures("mock_store")
 async def test_memory_service_numeric_search(hass: HomeAssistant) -> None:
     """Test searching for numbers in memory."""
-    with patch(
-        "custom_components.google_adk.local_memory_service.Store"
-    ) as mock_store_cls:
-        mock_store = mock_store_cls.return_value
-        mock_store.async_load = AsyncMock(return_value=None)
-        mock_store.async_save = AsyncMock()
-
-        service = LocalFileMemoryService(hass)
-
-        session = Session(
+    service = LocalFileMemoryService(hass)
+
+    await service.add_session_to_memory(_PHONE_SESSION)
+
+    # Search for "123456"
+    response = await service.search_memory(
+        app_name="app", user_id="user", query="123456"
+    )
+    assert len(response.memories) == 1
+    memory = response.memories[0]
+    assert memory.content is not None
+    assert memory.content.parts is not None
+    assert len(memory.content.parts) > 0
+    assert (text := memory.content.parts[0].text) is not None
+    assert "123456" in text
+
+
+async def test_memory_service_background_summarization(
+    hass: HomeAssistant, mock_store: MagicMock
+) -> None:
+    """Test background summarization when threshold is reached."""
+    mock_client = MagicMock()
+    mock_response = MagicMock()
+    mock_response.text = "This is a summary."
+    mock_client.aio.models.generate_content = AsyncMock(return_value=mock_response)
+
+    service = LocalFileMemoryService(
+        hass, summarize=True, client=mock_client, model_id="test-model"
+    )
+
+    # Add 24 messages (turns)
+    await service.add_session_to_memory(_TURNS_SESSION)
+    mock_client.aio.models.generate_content.assert_not_called()
+
+    # Add 1 more message to hit the threshold (25)
+    await service.add_session_to_memory(_FINAL_TURN_SESSION)
+
+    # Wait for background task
+    await hass.async_block_till_done()
+
+    # Verify summarization was called
+    mock_client.aio.models.generate_content.assert_called_once()
+
+    # Verify summary is in storage
+    saved_data = mock_store.async_delay_save.call_args[0][0]()
+    user_data = saved_data["app/user"]
+    assert "__summaries__" in user_data
+    assert (
+        "Memory Summary: This is a summary."
+        in user_data["__summaries__"]["texts"][0][0]
+    )
+
+    # Verify history is preserved
+    assert "session1" in user_data
+    assert "session2" in user_data
+
+    # Verify summarized events are tracked so they are not summarized again
+    assert user_data["__metadata__"]["summarized_event_counts"] == {
+        "session1": 24,
+        "session2": 1,
+    }
+
+    # The next summary builds on the previous one and only the events added since
+    await service.add_session_to_memory(_LATER_TURNS_SESSION)
+    await hass.async_block_till_done()
+
+    assert mock_client.aio.models.generate_content.call_count == 2
+    prompt = mock_client.aio.models.generate_content.call_args.kwargs["contents"]
+    assert "Previous Summary: Memory Summary: This is a summary." in prompt
+    assert "user: Later turn 0" in prompt
+    assert "user: Later turn 24" in prompt
+    assert "Turn 0" not in prompt
+    assert "Final turn" not in prompt
+
+    saved_data = mock_store.async_delay_save.call_args[0][0]()
+    assert saved_data["app/user"]["__metadata__"]["summarized_event_counts"] == {
+        "session1": 24,
+        "session2": 1,
+        "session3": 25,
+    }
+
+
+@pytest.mark.usefixtures("mock_store")
+async def test_memory_service_summarization_in_progress(hass: HomeAssistant) -> None:
+    """Test that a running summarization only blocks the same user."""
+    release = asyncio.Event()
+    started: asyncio.Queue[None] = asyncio.Queue()
+    mock_response = MagicMock()
+    mock_response.text = "This is a summary."
+
+    async def _generate_content(**kwargs: Any) -> MagicMock:
+        started.put_nowait(None)
+        await release.wait()
+        return mock_response
+
+    mock_client = MagicMock()
+    mock_client.aio.models.generate_content = AsyncMock(side_effect=_generate_content)
+    service = LocalFileMemoryService(
+        hass, summarize=True, client=mock_client, model_id="test-model"
+    )
+
+    await service.add_session_to_memory(_TURNS_SESSION)
+    await service.add_session_to_memory(_FINAL_TURN_SESSION)
+    await started.get()
+
+    # A second summarization for the same user returns without calling the model
+    await service._async_background_summarize("app", "user")
+    assert mock_client.aio.models.generate_content.call_count == 1
+
+    # Another user's summarization reaches the model while the first is running
+    await service.add_session_to_memory(_OTHER_USER_SESSION)
+    async with asyncio.timeout(1):
+        await started.get()
+    assert mock_client.aio.models.generate_content.call_count == 2
+
+    release.set()
+    await hass.async_block_till_done()
+
+
+@pytest.mark.usefixtures("mock_store")
+async def test_memory_service_session_update(hass: HomeAssistant) -> None:
+    """Test that re-adding a session replaces its previously indexed events."""
+    service = LocalFileMemoryService(hass)
+
+    await service.add_session_to_memory(
+        Session(
             id="s1",
             app_name="app",
             user_id="user",
             events=[
-                Event(
-                    author="user",
-                    content=Content(parts=[Part(text="My phone is 123456.")]),
-                )
+                Event(author="user", content=Content(parts=[Part(text="I like tea.")]))
             ],
         )
-
-        await service.add_session_to_memory(session)
-
-        # Search for "123456"
-        response = await service.search_memory(
-            app_name="app", user_id="user", query="123456"
-        )
-        assert len(response.memories) == 1
-        memory = response.memories[0]
-        assert memory.content is not None
-        assert memory.content.parts is not None
-        assert len(memory.content.parts) > 0
-        assert (text := memory.content.parts[0].text) is not None
-        assert "123456" in text
-
-
-async def test_memory_service_background_summarization(hass: HomeAssistant) -> None:
-    """Test background summarization when threshold is reached."""
-    with patch(
-        "custom_components.google_adk.local_memory_service.Store"
-    ) as mock_store_cls:
-        mock_store = mock_store_cls.return_value
-        mock_store.async_load = AsyncMock(return_value=None)
-        mock_store.async_save = AsyncMock()
-
-        mock_client = MagicMock()
-        mock_response = MagicMock()
-        mock_response.text = "This is a summary."
-        mock_client.aio.models.generate_content = AsyncMock(return_value=mock_response)
-
-        service = LocalFileMemoryService(
-            hass, summarize=True, client=mock_client, model_id="test-model"
-        )
-
-        # Add 24 messages (turns)
-        events = []
-        for i in range(24):
-            events.append(
-                Event(author="user", content=Content(parts=[Part(text=f"Turn {i}")]))
-            )
-
-        session = Session(
-            id="session1",
-            app_name="app",
-            user_id="user",
-            events=events,
-        )
-
-        await service.add_session_to_memory(session)
-        mock_client.aio.models.generate_content.assert_not_called()
-
-        # Add 1 more message to hit the threshold (25)
-        session2 = Session(
-            id="session2",
+    )
+    await service.add_session_to_memory(
+        Session(
+            id="s1",
             app_name="app",
             user_id="user",
             events=[
-                Event(author="user", content=Content(parts=[Part(text="Final turn")]))
+                Event(
+                    author="user",
+                    content=Content(parts=[Part(text="I like coffee.")]),
+                )
             ],
         )
-
-        await service.add_session_to_memory(session2)
-
-        # Wait for background task
-        await hass.async_block_till_done()
-
-        # Verify summarization was called
-        mock_client.aio.models.generate_content.assert_called_once()
-
-        # Verify summary is in storage
-        saved_data = mock_store.async_save.call_args[0][0]
-        user_data = saved_data["app/user"]
-        assert "__summaries__" in user_data
-        assert (
-            "Memory Summary: This is a summary."
-            in user_data["__summaries__"][0]["content"]["parts"][0]["text"]
-        )
-
-        # Verify history is preserved
-        assert "session1" in user_data
-        assert "session2" in user_data
+    )
+
+    response = await service.search_memory(app_name="app", user_id="user", query="tea")
+    assert len(response.memories) == 0
+
+    response = await service.search_memory(
+        app_name="app", user_id="user", query="coffee"
+    )
+    assert len(response.memories) == 1
+
+
+async def test_memory_service_migrate_v1(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test loading memory stored as per-event dicts."""
+    hass_storage["google_adk.memory"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": "google_adk.memory",
+        "data": {
+            "app/user": {
+                "s1": [
+                    {
+                        "timestamp": None,
+                        "author": "user",
+                        "content": {
+                            "role": "user",
+                            "parts": [{"text": "I love pears."}],
+                        },
+                    }
+                ],
+                "__metadata__": {"total_turns": 1},
+            }
+        },
+    }
+
+    service = LocalFileMemoryService(hass)
+    response = await service.search_memory(
+        app_name="app", user_id="user", query="pears"
+    )
+
+    assert len(response.memories) == 1
+    memory = response.memories[0]
+    assert memory.author == "user"
+    assert memory.content is not None
+    assert memory.content.role == "user"
+    assert memory.content.parts is not None
+    assert memory.content.parts[0].text == "I love pears."
+
+
+async def test_memory_service_skips_non_text_events(
+    hass: HomeAssistant, mock_store: MagicMock
+) -> None:
+    """Test that events without text are not stored or counted as turns."""
+    service = LocalFileMemoryService(hass)
+
+    session = Session(
+        id="s1",
+        app_name="app",
+        user_id="user",
+        events=[
+            Event(
+                author="assistant",
+                content=Content(
+                    parts=[
+                        Part(
+                            function_call=FunctionCall(
+                                name="get_weather", args={"city": "Paris"}
+                            )
+                        )
+                    ]
+                ),
+            ),
+            Event(author="user", content=Content(parts=[Part(text="Paris is sunny.")])),
+        ],
+    )
+
+    await service.add_session_to_memory(session)
+
+    saved_data = mock_store.async_delay_save.call_args[0][0]()
+    user_data = saved_data["app/user"]
+    assert user_data["s1"]["texts"] == [["Paris is sunny."]]
+    assert user_data["__metadata__"]["total_turns"] == 1
+
+
+async def test_memory_service_flush(hass: HomeAssistant, mock_store: MagicMock) -> None:
+    """Test flushing writes memory immediately, but only once it was loaded."""
+    service = LocalFileMemoryService(hass)
+
+    await service.async_flush()
+    mock_store.async_save.assert_not_called()
+
+    await service.add_session_to_memory(_APPLE_SESSION)
+    await service.async_flush()
+
+    mock_store.async_save.assert_awaited_once()
+    saved_data = mock_store.async_save.call_args[0][0]
+    assert "test_session" in saved_data["test_app/test_user"]
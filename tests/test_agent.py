@@ -0,0 +1,334 @@
+"""Tests for the agent module."""
+
+import asyncio
+from collections import OrderedDict
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+import voluptuous as vol
+from google.adk.models.base_llm import BaseLlm
+from homeassistant.config_entries import ConfigSubentryData
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import llm
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from voluptuous_openapi import convert
+
+from custom_components.google_adk import agent
+from custom_components.google_adk.agent import (
+    AdkLlmTool,
+    _AgentBuild,
+    _format_schema,
+    _get_model,
+    _get_tool_parameters,
+)
+from custom_components.google_adk.const import (
+    CONF_API_KEY,
+    CONF_DESCRIPTION,
+    CONF_INSTRUCTIONS,
+    CONF_MODEL,
+    CONF_SUB_AGENTS,
+    CONF_TOOLS,
+    DOMAIN,
+)
+
+JSON_FALLBACK = {"json": {"type": "STRING"}}
+
+
+@pytest.mark.parametrize(
+    ("schema", "expected"),
+    [
+        (
+            vol.Schema({}),
+            {"type": "OBJECT", "properties": JSON_FALLBACK, "required": []},
+        ),
+        (
+            vol.Schema({vol.Optional("param1", description="Test parameters"): str}),
+            {
+                "type": "OBJECT",
+                "properties": {
+                    "param1": {"type": "STRING", "description": "Test parameters"}
+                },
+                "required": [],
+            },
+        ),
+        (
+            vol.Schema(
+                {vol.Required("level"): vol.All(vol.Coerce(int), vol.In([1, 2, 3]))}
+            ),
+            {
+                "type": "OBJECT",
+                "properties": {"level": {"type": "STRING", "enum": ["1", "2", "3"]}},
+                "required": ["level"],
+            },
+        ),
+        (
+            vol.Schema({vol.Optional("options"): dict}),
+            {
+                "type": "OBJECT",
+                "properties": {
+                    "options": {
+                        "type": "OBJECT",
+                        "properties": JSON_FALLBACK,
+                        "required": [],
+                    }
+                },
+                "required": [],
+            },
+        ),
+    ],
+)
+def test_format_tool_schema(schema: vol.Schema, expected: dict[str, Any]) -> None:
+    """Test formatting tool parameter schemas for the Gemini API."""
+    assert _format_schema(convert(schema)) == expected
+
+
+@pytest.mark.parametrize(
+    ("schema", "expected"),
+    [
+        (
+            {"type": "object", "description": "No arguments", "nullable": True},
+            {
+                "type": "OBJECT",
+                "description": "No arguments",
+                "nullable": True,
+                "properties": JSON_FALLBACK,
+                "required": [],
+            },
+        ),
+        (
+            {"allOf": [{"description": "Any"}, {"type": "string", "format": "uuid"}]},
+            {"type": "STRING"},
+        ),
+        (
+            {
+                "type": "array",
+                "maxItems": 2,
+                "items": {"type": "integer", "format": "int32"},
+            },
+            {
+                "type": "ARRAY",
+                "max_items": 2,
+                "items": {"type": "INTEGER", "format": "int32"},
+            },
+        ),
+    ],
+)
+def test_format_openapi_schema(
+    schema: dict[str, Any], expected: dict[str, Any]
+) -> None:
+    """Test formatting OpenAPI schemas that need keys dropped or renamed."""
+    assert _format_schema(schema) == expected
+
+
+def test_get_model_reuses_instances() -> None:
+    """Test that a model instance is shared for the same name and API."""
+    build = _AgentBuild(Mock(), Mock(), {}, {})
+
+    model = _get_model(build, "gemini-2.5-flash", False)
+    assert isinstance(model, BaseLlm)
+    assert _get_model(build, "gemini-2.5-flash", False) is model
+    assert _get_model(build, "gemini-2.5-flash", True) is not model
+
+
+def test_get_model_unknown_name() -> None:
+    """Test that unknown model names are left for the agent to resolve."""
+    build = _AgentBuild(Mock(), Mock(), {}, {})
+
+    assert _get_model(build, "unknown-model", False) == "unknown-model"
+    assert not build.models
+
+
+def test_tool_declarations_not_shared() -> None:
+    """Test that each tool wrapper owns its declaration, since ADK mutates it."""
+    tool = Mock()
+    tool.name = "test_tool"
+    tool.description = "Test function"
+    tool.parameters = vol.Schema({vol.Optional("param1"): str})
+
+    build = _AgentBuild(Mock(), Mock(), {}, {})
+    parameters = _get_tool_parameters(build, tool)
+
+    first = AdkLlmTool(Mock(), tool, parameters)._get_declaration()
+    second = AdkLlmTool(Mock(), tool, parameters)._get_declaration()
+
+    assert first is not None
+    assert first == second
+    assert first is not second
+
+
+def test_format_schema_cache_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the least recently used formatted schemas are evicted."""
+    cache: OrderedDict[str, Any] = OrderedDict()
+    monkeypatch.setattr(agent, "_SCHEMA_CACHE", cache)
+    monkeypatch.setattr(agent, "_SCHEMA_CACHE_SIZE", 2)
+    first = {"type": "string", "description": "first"}
+    second = {"type": "string", "description": "second"}
+
+    result = _format_schema(first)
+    _format_schema(second)
+    assert _format_schema(first) is result
+    _format_schema({"type": "string", "description": "third"})
+
+    assert len(cache) == 2
+    assert _format_schema(first) is result
+
+
+def _agent_subentry(
+    subentry_id: str, title: str, data: dict[str, Any] | None = None
+) -> ConfigSubentryData:
+    """Return the data for an agent subentry."""
+    return {
+        "title": title,
+        "subentry_id": subentry_id,
+        "subentry_type": "conversation",
+        "data": {
+            CONF_MODEL: "gemini-2.5-flash",
+            CONF_DESCRIPTION: f"The {title}",
+            CONF_INSTRUCTIONS: "You are a helpful agent.",
+            **(data or {}),
+        },
+        "unique_id": None,
+    }
+
+
+async def test_sub_agent_cycle(
+    hass: HomeAssistant, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test that a sub-agent referring back to an ancestor is skipped."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: "test_api_key"},
+        subentries_data=[
+            _agent_subentry(
+                "ulid-root", "root_agent", {CONF_SUB_AGENTS: ["ulid-child"]}
+            ),
+            _agent_subentry(
+                "ulid-child", "child_agent", {CONF_SUB_AGENTS: ["ulid-root"]}
+            ),
+        ],
+    )
+    config_entry.add_to_hass(hass)
+
+    root = await agent.async_create(hass, config_entry.subentries["ulid-root"], Mock())
+
+    assert [sub_agent.name for sub_agent in root.sub_agents] == ["child_agent"]
+    assert root.sub_agents[0].sub_agents == []
+    assert "Sub-agent 'root_agent' for agent 'child_agent' would create a cycle" in (
+        caplog.text
+    )
+
+
+async def test_failed_sub_agent_raises(hass: HomeAssistant) -> None:
+    """Test that an error building a sub-agent is raised for the whole tree."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: "test_api_key"},
+        subentries_data=[
+            _agent_subentry(
+                "ulid-root",
+                "root_agent",
+                {CONF_SUB_AGENTS: ["ulid-broken", "ulid-child"]},
+            ),
+            _agent_subentry(
+                "ulid-broken", "broken_agent", {CONF_TOOLS: ["missing_api"]}
+            ),
+            _agent_subentry("ulid-child", "child_agent"),
+        ],
+    )
+    config_entry.add_to_hass(hass)
+
+    with pytest.raises(HomeAssistantError, match="missing_api"):
+        await agent.async_create(hass, config_entry.subentries["ulid-root"], Mock())
+
+
+async def test_tool_parameters_converted_once(hass: HomeAssistant) -> None:
+    """Test that agents sharing a tool bundle convert each tool schema once."""
+    tool = Mock()
+    tool.name = "test_tool"
+    tool.description = "Test function"
+    tool.parameters = vol.Schema({vol.Optional("param1"): str})
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: "test_api_key"},
+        subentries_data=[
+            _agent_subentry(
+                "ulid-root",
+                "root_agent",
+                {CONF_TOOLS: ["assist"], CONF_SUB_AGENTS: ["ulid-child"]},
+            ),
+            _agent_subentry("ulid-child", "child_agent", {CONF_TOOLS: ["assist"]}),
+        ],
+    )
+    config_entry.add_to_hass(hass)
+
+    with (
+        patch.object(llm, "async_get_api", AsyncMock(return_value=Mock(tools=[tool]))),
+        patch.object(agent, "convert", wraps=convert) as mock_convert,
+    ):
+        root = await agent.async_create(
+            hass, config_entry.subentries["ulid-root"], Mock()
+        )
+
+    assert mock_convert.call_count == 1
+    assert root.tools[0] is not root.sub_agents[0].tools[0]
+
+
+async def test_tool_bundle_looked_up_once(hass: HomeAssistant) -> None:
+    """Test that a parent and sub-agent sharing a tool bundle look it up once."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: "test_api_key"},
+        subentries_data=[
+            _agent_subentry(
+                "ulid-root",
+                "root_agent",
+                {CONF_TOOLS: ["assist"], CONF_SUB_AGENTS: ["ulid-child"]},
+            ),
+            _agent_subentry("ulid-child", "child_agent", {CONF_TOOLS: ["assist"]}),
+        ],
+    )
+    config_entry.add_to_hass(hass)
+
+    with patch.object(
+        llm, "async_get_api", AsyncMock(return_value=Mock(tools=[]))
+    ) as mock_get_api:
+        await agent.async_create(hass, config_entry.subentries["ulid-root"], Mock())
+
+    mock_get_api.assert_awaited_once()
+
+
+async def test_tool_bundle_shared_by_concurrent_sub_agents(
+    hass: HomeAssistant,
+) -> None:
+    """Test that sibling sub-agents built concurrently share one bundle lookup."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: "test_api_key"},
+        subentries_data=[
+            _agent_subentry(
+                "ulid-root",
+                "root_agent",
+                {CONF_SUB_AGENTS: ["ulid-first", "ulid-second"]},
+            ),
+            _agent_subentry("ulid-first", "first_agent", {CONF_TOOLS: ["assist"]}),
+            _agent_subentry("ulid-second", "second_agent", {CONF_TOOLS: ["assist"]}),
+        ],
+    )
+    config_entry.add_to_hass(hass)
+
+    async def _async_get_api(*args: Any) -> Mock:
+        # Yield so the second sibling starts while the lookup is in flight
+        await asyncio.sleep(0)
+        return Mock(tools=[])
+
+    with patch.object(
+        llm, "async_get_api", AsyncMock(side_effect=_async_get_api)
+    ) as mock_get_api:
+        root = await agent.async_create(
+            hass, config_entry.subentries["ulid-root"], Mock()
+        )
+
+    assert len(root.sub_agents) == 2
+    mock_get_api.assert_awaited_once()
@@ -1,17 +1,24 @@
 """Tests for the conversation integration."""
 
+import asyncio
 from collections.abc import AsyncGenerator, Generator
+from typing import cast
 from unittest.mock import AsyncMock, Mock, patch
 
 import httpx
 import pytest
 import voluptuous as vol
+from google.adk.events.event import Event
+from google.adk.models.registry import LLMRegistry
+from google.adk.sessions import Session
 from google.genai import types
 from google.genai.errors import APIError, ClientError
 from homeassistant.components import conversation
+from homeassistant.components.conversation.const import DATA_COMPONENT
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.const import Platform
 from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import intent
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
@@ -24,6 +31,9 @@ from custom_components.google_adk.const import (
     CONF_TOOLS,
     DOMAIN,
 )
+from custom_components.google_adk.conversation import (
+    _async_stream_response,
+)
 
 TEST_AGENT_ID = "conversation.assistant_agent"
 
@@ -528,3 +538,367 @@ async def test_thoughts_and_tool_calls(
     # Check final content
     content_deltas = [d for d in deltas if "content" in d]
     assert any("It is 20 degrees" in d["content"] for d in content_deltas)
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+async def test_memory_survives_reload(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test that memory added before a reload is found after it."""
+    component = hass.data[DATA_COMPONENT]
+    entity = component.get_entity(TEST_AGENT_ID)
+    assert entity is not None
+    memory_service = entity._memory_service
+    assert memory_service is not None
+
+    await memory_service.add_session_to_memory(
+        Session(
+            id="s1",
+            app_name="app",
+            user_id="user",
+            events=[
+                Event(
+                    author="user",
+                    content=types.Content(parts=[types.Part(text="I love apples.")]),
+                )
+            ],
+        )
+    )
+
+    assert await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity = component.get_entity(TEST_AGENT_ID)
+    assert entity is not None
+    assert entity._memory_service is not None
+    assert entity._memory_service is not memory_service
+    response = await entity._memory_service.search_memory(
+        app_name="app", user_id="user", query="apples"
+    )
+    assert len(response.memories) == 1
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+async def test_model_reused_across_turns(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    mock_send_message_stream: AsyncMock,
+) -> None:
+    """Test that the model is resolved once and reused on later turns."""
+    mock_send_message_stream.return_value = [
+        [
+            types.GenerateContentResponse(
+                candidates=[
+                    types.Candidate(
+                        content=types.Content(
+                            parts=[types.Part(text=text)],
+                            role="model",
+                        ),
+                        finish_reason=types.FinishReason.STOP,
+                    )
+                ],
+            ),
+        ]
+        for text in ("Hello!", "Hello again!")
+    ]
+
+    with patch.object(
+        LLMRegistry, "new_llm", wraps=LLMRegistry.new_llm
+    ) as mock_new_llm:
+        for _ in range(2):
+            result = await conversation.async_converse(
+                hass,
+                "Hello",
+                None,
+                Context(),
+                agent_id=TEST_AGENT_ID,
+            )
+            assert (
+                result.response.response_type == intent.IntentResponseType.ACTION_DONE
+            ), result
+
+    mock_new_llm.assert_called_once_with("gemini-2.5-flash")
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+async def test_unknown_model(
+    hass: HomeAssistant,
+) -> None:
+    """Test that an unknown model name is reported as a response error."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Google ADK",
+        data={
+            CONF_API_KEY: "test_api_key",
+        },
+        subentries_data=[
+            {
+                "title": "assistant_agent",
+                "subentry_id": "ulid-assistant-conversation",
+                "subentry_type": "conversation",
+                "data": {
+                    CONF_MODEL: "unknown-model",
+                    CONF_DESCRIPTION: "A helper agent that can answer users' questions.",
+                    CONF_INSTRUCTIONS: "You are an agent to help answer users' various questions.",
+                },
+            },
+        ],
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    result = await conversation.async_converse(
+        hass,
+        "Hello",
+        None,
+        Context(),
+        agent_id=TEST_AGENT_ID,
+    )
+    assert result.response.response_type == intent.IntentResponseType.ERROR, result
+    assert (
+        "Sorry, I had a problem getting a response"
+        in result.response.as_dict()["speech"]["plain"]["speech"]
+    )
+
+
+def _text_event(text: str) -> Event:
+    """Return a partial streamed text event."""
+    return Event(
+        author="assistant_agent",
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        partial=True,
+    )
+
+
+_TOOL_CALL_EVENT = Event(
+    author="assistant_agent",
+    content=types.Content(
+        role="model",
+        parts=[
+            types.Part(
+                function_call=types.FunctionCall(
+                    name="test_tool", args={"param1": "test_value"}
+                )
+            )
+        ],
+    ),
+)
+_TOOL_RESULT_EVENT = Event(
+    author="assistant_agent",
+    content=types.Content(
+        role="user",
+        parts=[
+            types.Part(
+                function_response=types.FunctionResponse(
+                    name="test_tool", response={"result": "Test response"}
+                )
+            )
+        ],
+    ),
+)
+
+
+async def _async_events(
+    events: list[Event], error: Exception | None = None
+) -> AsyncGenerator[Event]:
+    """Yield the events, then raise the error if one is given."""
+    for event in events:
+        yield event
+    if error is not None:
+        raise error
+
+
+async def _async_collect(
+    stream: AsyncGenerator[conversation.AssistantContentDeltaDict],
+) -> list[conversation.AssistantContentDeltaDict]:
+    """Return all chunks from the stream."""
+    return [chunk async for chunk in stream]
+
+
+@pytest.fixture(name="slow_flush")
+def slow_flush_fixture() -> Generator[None]:
+    """Only flush buffered deltas on size so chunking is deterministic."""
+    with patch("custom_components.google_adk.conversation._FLUSH_INTERVAL", 60):
+        yield
+
+
+@pytest.mark.usefixtures("slow_flush")
+async def test_transform_stream_coalesces_deltas(hass: HomeAssistant) -> None:
+    """Test that deltas arriving together are sent as one chunk."""
+    events = [_text_event("The capital of"), _text_event(" France"), _text_event(" is")]
+
+    chunks = await _async_collect(
+        _async_stream_response(hass, Mock(), _async_events(events))
+    )
+
+    assert chunks == [
+        {"role": "assistant", "content": "The capital of"},
+        {"content": " France is"},
+    ]
+
+
+@pytest.mark.usefixtures("slow_flush")
+async def test_transform_stream_role_on_first_chunk(hass: HomeAssistant) -> None:
+    """Test that the role is sent with the first chunk, whatever it contains."""
+    chunks = await _async_collect(
+        _async_stream_response(hass, Mock(), _async_events([_TOOL_CALL_EVENT]))
+    )
+
+    assert chunks == [
+        {
+            "role": "assistant",
+            "thinking_content": "[Calling tool: test_tool({'param1': 'test_value'})]",
+        }
+    ]
+
+
+@pytest.mark.usefixtures("slow_flush")
+async def test_transform_stream_tool_chunks(hass: HomeAssistant) -> None:
+    """Test that tool calls and results are kept in their own chunks."""
+    events = [
+        _text_event("Let me"),
+        _text_event(" check."),
+        _TOOL_CALL_EVENT,
+        _TOOL_RESULT_EVENT,
+        _text_event("Done."),
+    ]
+
+    chunks = await _async_collect(
+        _async_stream_response(hass, Mock(), _async_events(events))
+    )
+
+    assert chunks == [
+        {"role": "assistant", "content": "Let me"},
+        {"content": " check."},
+        {"thinking_content": "[Calling tool: test_tool({'param1': 'test_value'})]"},
+        {"thinking_content": "[Tool result: test_tool -> {'result': 'Test response'}]"},
+        {"content": "Done."},
+    ]
+
+
+async def test_transform_stream_flushes_after_interval(hass: HomeAssistant) -> None:
+    """Test that a buffered delta is sent without waiting for the next event."""
+    release = asyncio.Event()
+
+    async def _async_slow_events() -> AsyncGenerator[Event]:
+        yield _text_event("Hello")
+        yield _text_event(" there")
+        await release.wait()
+        yield _text_event("!")
+
+    chunks = []
+    async with asyncio.timeout(5):
+        async for chunk in _async_stream_response(hass, Mock(), _async_slow_events()):
+            chunks.append(chunk)
+            if chunk.get("content") == " there":
+                release.set()
+
+    assert chunks == [
+        {"role": "assistant", "content": "Hello"},
+        {"content": " there"},
+        {"content": "!"},
+    ]
+
+
+@pytest.mark.usefixtures("slow_flush")
+async def test_transform_stream_error_flushes_buffer(hass: HomeAssistant) -> None:
+    """Test that buffered deltas are sent before the error is raised."""
+    events = [_text_event("Hello"), _text_event(" there")]
+    chunks = []
+
+    with pytest.raises(HomeAssistantError, match="Sorry, I had a problem"):
+        async for chunk in _async_stream_response(
+            hass, Mock(), _async_events(events, ValueError("boom"))
+        ):
+            chunks.append(chunk)
+
+    assert chunks == [
+        {"role": "assistant", "content": "Hello"},
+        {"content": " there"},
+    ]
+
+
+async def test_stream_response_reader_stops_early(hass: HomeAssistant) -> None:
+    """Test that closing the reader stops and closes the runner events."""
+    closed = asyncio.Event()
+    event = _text_event("Hello")
+
+    async def _async_endless_events() -> AsyncGenerator[Event]:
+        try:
+            while True:
+                yield event
+        finally:
+            closed.set()
+
+    reader = _async_stream_response(hass, Mock(), _async_endless_events())
+    assert await anext(reader) == {"role": "assistant", "content": "Hello"}
+    await reader.aclose()
+
+    assert closed.is_set()
+
+
+async def test_stream_response_producer_cancelled(hass: HomeAssistant) -> None:
+    """Test that the reader does not wait forever if the producer is cancelled."""
+    producers: list[asyncio.Task[None]] = []
+    event = _text_event("Hello")
+
+    async def _async_stalled_events() -> AsyncGenerator[Event]:
+        producers.append(cast(asyncio.Task[None], asyncio.current_task()))
+        yield event
+        await asyncio.Event().wait()
+
+    reader = _async_stream_response(hass, Mock(), _async_stalled_events())
+    assert await anext(reader) == {"role": "assistant", "content": "Hello"}
+    producers[0].cancel()
+
+    async with asyncio.timeout(5):
+        with pytest.raises(HomeAssistantError, match="Sorry, I had a problem"):
+            await anext(reader)
+
+
+@pytest.mark.parametrize("expected_lingering_tasks", [True])
+async def test_session_cache(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    mock_send_message_stream: AsyncMock,
+) -> None:
+    """Test that known sessions are bounded and forgotten after an error."""
+    mock_send_message_stream.return_value = [
+        [
+            types.GenerateContentResponse(
+                candidates=[
+                    types.Candidate(
+                        content=types.Content(
+                            parts=[types.Part(text=text)],
+                            role="model",
+                        ),
+                        finish_reason=types.FinishReason.STOP,
+                    )
+                ],
+            ),
+        ]
+        for text in ("Hello!", "Hi!")
+    ]
+    entity = hass.data[DATA_COMPONENT].get_entity(TEST_AGENT_ID)
+    assert entity is not None
+
+    with patch("custom_components.google_adk.conversation._MAX_SESSIONS", 1):
+        first = await conversation.async_converse(
+            hass, "Hello", None, Context(), agent_id=TEST_AGENT_ID
+        )
+        assert [key[2] for key in entity._sessions] == [first.conversation_id]
+
+        second = await conversation.async_converse(
+            hass, "Hello", None, Context(), agent_id=TEST_AGENT_ID
+        )
+        assert second.conversation_id != first.conversation_id
+        assert [key[2] for key in entity._sessions] == [second.conversation_id]
+
+    mock_send_message_stream.side_effect = API_ERROR_500
+    result = await conversation.async_converse(
+        hass, "Hello", second.conversation_id, Context(), agent_id=TEST_AGENT_ID
+    )
+    assert result.response.response_type == intent.IntentResponseType.ERROR, result
+    assert not entity._sessions
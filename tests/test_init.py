@@ -1,11 +1,59 @@
 """Tests for the google_adk component."""
 
+import os
+from unittest.mock import patch
+
 import pytest
+from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import (
     MockConfigEntry,
 )
 
+from custom_components import google_adk
+from custom_components.google_adk.const import CONF_API_KEY, CONF_INSTRUCTIONS, DOMAIN
+
 
 @pytest.fixture(autouse=True)
 def mock_setup_integration(config_entry: MockConfigEntry) -> None:
     """Setup the integration"""
+
+
+async def test_reload_on_settings_change(
+    hass: HomeAssistant, config_entry: MockConfigEntry
+) -> None:
+    """Test the entry is only reloaded when agent settings change."""
+    subentry = next(iter(config_entry.subentries.values()))
+
+    with patch.object(hass.config_entries, "async_reload") as mock_reload:
+        hass.config_entries.async_update_subentry(
+            config_entry,
+            subentry,
+            data={**subentry.data, CONF_INSTRUCTIONS: "Updated instructions."},
+        )
+        await hass.async_block_till_done()
+        assert len(mock_reload.mock_calls) == 1
+
+        # A title change does not affect the agents
+        hass.config_entries.async_update_entry(config_entry, title="Renamed")
+        await hass.async_block_till_done()
+        assert len(mock_reload.mock_calls) == 1
+
+
+async def test_api_key_set_once(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the API key environment variable is only checked on the first setup."""
+    monkeypatch.setattr(google_adk, "_API_KEY_SET", False)
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+
+    first_entry = MockConfigEntry(domain=DOMAIN, data={CONF_API_KEY: "first_key"})
+    first_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(first_entry.entry_id)
+    assert os.environ["GOOGLE_API_KEY"] == "first_key"
+
+    # Later setups skip the probe, so the unset variable is not filled in
+    monkeypatch.delenv("GOOGLE_API_KEY")
+    second_entry = MockConfigEntry(domain=DOMAIN, data={CONF_API_KEY: "second_key"})
+    second_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(second_entry.entry_id)
+    assert "GOOGLE_API_KEY" not in os.environ